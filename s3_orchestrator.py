@@ -1,20 +1,128 @@
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+import numpy as np
 import pandas as pd
 import requests
-import xml.etree.ElementTree as ET
-import json
+from requests.adapters import HTTPAdapter
+from lxml import etree
+import orjson
+import hashlib
 import asyncio
-import aiohttp
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Optional, Any
+import httpx
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, as_completed, wait)
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Any
 import logging
+import multiprocessing
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from io import BytesIO
 
+try:
+    import h2  # noqa: F401 -- enables HTTP/2 in httpx
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+try:
+    import python_calamine  # noqa: F401 -- Rust-based Excel reader
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = None  # pandas default (openpyxl/xlrd)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Suffix of the sidecar objects holding processing metadata
+METADATA_SUFFIX = '.meta.json'
+
+# Object tag holding a hash of the last metadata written for an object
+METADATA_HASH_TAG = 'processing-metadata-hash'
+
+# Maximum number of tags S3 allows on an object
+S3_MAX_OBJECT_TAGS = 10
+
+# Keys per S3 list page (the API maximum); also the Excel matching batch size
+S3_LIST_PAGE_SIZE = 1000
+
+# Deepest XML nesting accepted from the API (libxml2 itself stops at 2048
+# with huge_tree enabled, and at 256 without it)
+MAX_XML_DEPTH = 2000
+
+def _parse_xml_bytes(content: bytes) -> Dict[str, Any]:
+    """
+    Convert an XML document to a dictionary in a single streaming pass
+    
+    Attributes become keys, element text is returned directly for leaf
+    elements (or stored under 'text' otherwise), and repeated child tags
+    are collected into lists. Defined at module level so it can be sent
+    to a ProcessPoolExecutor.
+    
+    Raises ValueError for malformed documents and for documents nested
+    deeper than MAX_XML_DEPTH (lxml's own parse errors cannot be pickled
+    back from a worker process).
+    """
+    try:
+        return _iterparse_to_dict(content)
+    except etree.XMLSyntaxError as e:
+        raise ValueError(str(e)) from e
+
+def _iterparse_to_dict(content: bytes) -> Dict[str, Any]:
+    """Streaming conversion behind _parse_xml_bytes"""
+    # Each frame holds an element's attributes and its converted children
+    stack = []
+    result = {}
+    
+    # Internal entities are expanded and comments/PIs dropped so element
+    # text is not split; external entities and network access stay off
+    events = etree.iterparse(BytesIO(content), events=('start', 'end'),
+                             resolve_entities='internal', no_network=True,
+                             remove_comments=True, remove_pis=True,
+                             huge_tree=True)
+    for event, element in events:
+        if event == 'start':
+            if len(stack) >= MAX_XML_DEPTH:
+                raise ValueError(
+                    f"XML document nested deeper than {MAX_XML_DEPTH} levels"
+                )
+            stack.append((dict(element.attrib), []))
+            continue
+        
+        attributes, children = stack.pop()
+        text = element.text.strip() if element.text else ''
+        
+        if text and not children:
+            value = text
+        else:
+            value = attributes
+            if text:
+                value['text'] = text
+            for tag, child_data in children:
+                if tag in value:
+                    # Convert to list if multiple elements with same tag
+                    if not isinstance(value[tag], list):
+                        value[tag] = [value[tag]]
+                    value[tag].append(child_data)
+                else:
+                    value[tag] = child_data
+        
+        if stack:
+            stack[-1][1].append((element.tag, value))
+        else:
+            result = value
+        
+        # Free parsed elements as soon as they have been converted
+        element.clear(keep_tail=True)
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+    
+    return result
+
 @dataclass
 class ProcessingResult:
     """Data class to hold processing results"""
@@ -25,6 +133,9 @@ class ProcessingResult:
     success: bool
     error_message: Optional[str] = None
 
+# Callback receiving each ProcessingResult as it completes
+ResultCallback = Callable[[ProcessingResult], None]
+
 class S3ExcelAPIOrchestrator:
     def __init__(self, 
                  s3_bucket_name: str,
@@ -33,7 +144,12 @@ class S3ExcelAPIOrchestrator:
                  excel_match_column: str,
                  aws_access_key_id: str = None,
                  aws_secret_access_key: str = None,
-                 aws_region: str = 'us-east-1'):
+                 aws_region: str = 'us-east-1',
+                 max_pool_connections: int = 50,
+                 needed_columns: Optional[List[str]] = None,
+                 api_cache_size: int = 10000,
+                 api_cache_per_run: bool = True,
+                 xml_parse_processes: int = 0):
         """
         Initialize the orchestrator
         
@@ -45,19 +161,60 @@ class S3ExcelAPIOrchestrator:
             aws_access_key_id: AWS access key (optional if using IAM roles)
             aws_secret_access_key: AWS secret key (optional if using IAM roles)
             aws_region: AWS region
+            max_pool_connections: S3 connection pool size; should be at least
+                the number of concurrent workers
+            needed_columns: Excel columns to load besides the match column
+                (optional, defaults to all columns)
+            api_cache_size: Maximum number of API responses cached by identifier
+            api_cache_per_run: Clear the API cache at the start of each
+                process_keys_async/process_keys_sync run. If False, cached
+                responses never expire and later runs will not see API
+                changes for identifiers already cached (see clear_api_cache)
+            xml_parse_processes: Worker processes for parsing API XML in the
+                async path (default 0 parses on the event loop). Only pays
+                off for large responses on multi-core hosts; scripts using
+                it need an ``if __name__ == "__main__"`` guard
         """
         self.s3_bucket_name = s3_bucket_name
         self.excel_file_path = excel_file_path
         self.api_base_url = api_base_url
         self.excel_match_column = excel_match_column
+        self.needed_columns = needed_columns
         
-        # Initialize S3 client
+        # Initialize S3 client (thread-safe, shared by all workers)
         session = boto3.Session(
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
             region_name=aws_region
         )
-        self.s3_client = session.client('s3')
+        self.s3_config = Config(
+            max_pool_connections=max_pool_connections,
+            retries={'mode': 'adaptive', 'max_attempts': 10},
+            connect_timeout=5,
+            read_timeout=30
+        )
+        self.s3_client = session.client('s3', config=self.s3_config)
+        
+        # Keep-alive HTTP session for the synchronous API path
+        self._http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_pool_connections,
+                              pool_maxsize=max_pool_connections)
+        self._http.mount('https://', adapter)
+        self._http.mount('http://', adapter)
+        
+        # LRU cache of parsed API responses, shared by all workers
+        self.api_cache_size = api_cache_size
+        self.api_cache_per_run = api_cache_per_run
+        self._api_cache = OrderedDict()
+        self._api_cache_lock = threading.Lock()
+        self._api_pending = {}
+        
+        # Optional process pool for XML parsing, created on first async run
+        self.xml_parse_processes = xml_parse_processes
+        self._xml_pool = None
+        
+        # Thread pool for blocking S3 calls, sized per async run
+        self._s3_executor = None
         
         # Load Excel data
         self.excel_df = self._load_excel_data()
@@ -65,6 +222,12 @@ class S3ExcelAPIOrchestrator:
     def _load_excel_data(self) -> pd.DataFrame:
         """Load Excel data from local file or S3"""
         try:
+            read_kwargs = {'engine': EXCEL_ENGINE}
+            if self.needed_columns is not None:
+                read_kwargs['usecols'] = list(dict.fromkeys(
+                    [self.excel_match_column, *self.needed_columns]
+                ))
+            
             if self.excel_file_path.startswith('s3://'):
                 # Load from S3
                 bucket_name = self.excel_file_path.split('/')[2]
@@ -72,10 +235,24 @@ class S3ExcelAPIOrchestrator:
                 
                 obj = self.s3_client.get_object(Bucket=bucket_name, Key=key)
                 excel_data = obj['Body'].read()
-                df = pd.read_excel(BytesIO(excel_data))
+                df = pd.read_excel(BytesIO(excel_data), **read_kwargs)
             else:
                 # Load from local file
-                df = pd.read_excel(self.excel_file_path)
+                df = pd.read_excel(self.excel_file_path, **read_kwargs)
+            
+            # Index rows by match column once; first matching row wins
+            match_keys = df[self.excel_match_column].astype(str)
+            first_match = ~match_keys.duplicated()
+            self._excel_match_index = pd.Index(match_keys[first_match])
+            self._excel_positions = np.flatnonzero(first_match.to_numpy())
+            self._excel_index = dict(zip(self._excel_match_index,
+                                         self._excel_positions.tolist()))
+            
+            # Convert any NaN values to None for JSON serialization
+            df = df.astype(object).where(pd.notna(df), None)
+            
+            # Column arrays for row lookups without pandas on the hot path
+            self._excel_columns = {col: df[col].to_numpy() for col in df.columns}
             
             logger.info(f"Loaded Excel data with {len(df)} rows")
             return df
@@ -84,21 +261,30 @@ class S3ExcelAPIOrchestrator:
             logger.error(f"Failed to load Excel data: {str(e)}")
             raise
     
-    def get_s3_keys(self, prefix: str = '', max_keys: int = 1000) -> List[str]:
-        """Get list of keys from S3 bucket"""
+    def get_s3_keys(self, prefix: str = '',
+                    max_keys: Optional[int] = None) -> Iterator[str]:
+        """Stream keys from S3 bucket, page by page"""
         try:
-            response = self.s3_client.list_objects_v2(
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            pages = paginator.paginate(
                 Bucket=self.s3_bucket_name,
                 Prefix=prefix,
-                MaxKeys=max_keys
+                PaginationConfig={'PageSize': S3_LIST_PAGE_SIZE}
             )
             
-            keys = []
-            if 'Contents' in response:
-                keys = [obj['Key'] for obj in response['Contents']]
+            keys = (
+                obj['Key']
+                for page in pages
+                for obj in page.get('Contents', [])
+                if not obj['Key'].endswith(METADATA_SUFFIX)
+            )
+            
+            count = 0
+            for key in islice(keys, max_keys):
+                count += 1
+                yield key
             
-            logger.info(f"Found {len(keys)} keys in S3 bucket")
-            return keys
+            logger.info(f"Found {count} keys in S3 bucket")
             
         except Exception as e:
             logger.error(f"Failed to get S3 keys: {str(e)}")
@@ -110,90 +296,134 @@ class S3ExcelAPIOrchestrator:
         Customize this method based on your key naming convention
         """
         # Example: extract filename without extension
-        filename = s3_key.split('/')[-1]
-        identifier = filename.split('.')[0]
-        return identifier
+        filename = s3_key.rpartition('/')[2]
+        return filename.partition('.')[0]
     
     def get_excel_row(self, identifier: str) -> Dict[str, Any]:
         """Get matching row from Excel data"""
+        pos = self._excel_index.get(str(identifier))
+        
+        if pos is None:
+            return {"error": f"No matching row found for identifier: {identifier}"}
+        
+        return self._excel_row(pos)
+    
+    def bulk_get_excel_rows(self, identifiers: List[str]) -> List[Dict[str, Any]]:
+        """Get matching rows from Excel data for many identifiers in one lookup"""
+        matches = self._excel_match_index.get_indexer([str(i) for i in identifiers])
+        
+        return [
+            self._excel_row(self._excel_positions[match]) if match != -1
+            else {"error": f"No matching row found for identifier: {identifier}"}
+            for identifier, match in zip(identifiers, matches)
+        ]
+    
+    def _excel_row(self, pos: int) -> Dict[str, Any]:
+        """Build the Excel row at a position from the column arrays"""
+        return {col: values[pos] for col, values in self._excel_columns.items()}
+    
+    def _match_excel_rows(self, s3_keys: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Pair each S3 key with its Excel row, keeping duplicate keys"""
+        identifiers = [self.extract_identifier_from_key(key) for key in s3_keys]
+        return list(zip(s3_keys, self.bulk_get_excel_rows(identifiers)))
+    
+    def _get_cached_api_data(self, identifier: str) -> Optional[Dict[str, Any]]:
+        """Return cached API data for an identifier, if any"""
+        with self._api_cache_lock:
+            api_data = self._api_cache.get(identifier)
+            if api_data is not None:
+                self._api_cache.move_to_end(identifier)
+            return api_data
+    
+    def _cache_api_data(self, identifier: str, api_data: Dict[str, Any]) -> None:
+        """Cache successful API data, evicting the least recently used entry"""
+        with self._api_cache_lock:
+            self._api_cache[identifier] = api_data
+            self._api_cache.move_to_end(identifier)
+            if len(self._api_cache) > self.api_cache_size:
+                self._api_cache.popitem(last=False)
+    
+    def clear_api_cache(self) -> None:
+        """Drop all cached API responses"""
+        with self._api_cache_lock:
+            self._api_cache.clear()
+    
+    async def query_api(self, client: httpx.AsyncClient, identifier: str) -> Dict[str, Any]:
+        """
+        Query API asynchronously, sharing results between keys with the same identifier
+        
+        The returned data may be a cached object shared with other keys and
+        must be treated as read-only.
+        """
+        api_data = self._get_cached_api_data(identifier)
+        if api_data is not None:
+            return api_data
+        
+        # Concurrent lookups of the same identifier wait on a single request
+        pending = self._api_pending.get(identifier)
+        if pending is not None:
+            _, api_data = await asyncio.shield(pending)
+            return api_data
+        
+        pending = asyncio.ensure_future(self._fetch_api_data(client, identifier))
+        self._api_pending[identifier] = pending
         try:
-            matching_rows = self.excel_df[
-                self.excel_df[self.excel_match_column].astype(str) == str(identifier)
-            ]
-            
-            if matching_rows.empty:
-                return {"error": f"No matching row found for identifier: {identifier}"}
-            
-            # Return first matching row as dictionary
-            row_data = matching_rows.iloc[0].to_dict()
-            
-            # Convert any NaN values to None for JSON serialization
-            for key, value in row_data.items():
-                if pd.isna(value):
-                    row_data[key] = None
-            
-            return row_data
-            
-        except Exception as e:
-            logger.error(f"Failed to get Excel row for {identifier}: {str(e)}")
-            return {"error": str(e)}
+            ok, api_data = await asyncio.shield(pending)
+        finally:
+            self._api_pending.pop(identifier, None)
+        
+        # Only cache real responses so failed fetches are retried
+        if ok:
+            self._cache_api_data(identifier, api_data)
+        return api_data
     
-    async def query_api(self, session: aiohttp.ClientSession, identifier: str) -> Dict[str, Any]:
-        """Query API asynchronously"""
+    async def _fetch_api_data(self, client: httpx.AsyncClient,
+                              identifier: str) -> Tuple[bool, Dict[str, Any]]:
+        """Fetch and parse API data for an identifier, flagging whether it succeeded"""
         try:
             url = f"{self.api_base_url}/{identifier}"
             
-            async with session.get(url, timeout=30) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    
-                    # Parse XML response
-                    root = ET.fromstring(content)
-                    api_data = self._xml_to_dict(root)
-                    
-                    return api_data
+            # httpx timeouts apply per phase; also cap the whole request
+            response = await asyncio.wait_for(client.get(url), timeout=30)
+            if response.status_code == 200:
+                content = response.content
+                
+                # Parse XML response (CPU-bound) in worker processes if available
+                if self._xml_pool is not None:
+                    loop = asyncio.get_running_loop()
+                    api_data = await loop.run_in_executor(
+                        self._xml_pool, _parse_xml_bytes, content
+                    )
                 else:
-                    return {"error": f"API request failed with status {response.status}"}
-                    
+                    api_data = self._xml_to_dict(content)
+                
+                return True, api_data
+            else:
+                return False, {"error": f"API request failed with status {response.status_code}"}
+                
         except Exception as e:
             logger.error(f"API query failed for {identifier}: {str(e)}")
-            return {"error": str(e)}
+            return False, {"error": str(e)}
     
-    def _xml_to_dict(self, element: ET.Element) -> Dict[str, Any]:
-        """Convert XML element to dictionary"""
-        result = {}
-        
-        # Add element attributes
-        if element.attrib:
-            result.update(element.attrib)
-        
-        # Handle element text
-        if element.text and element.text.strip():
-            if len(element) == 0:  # No children
-                return element.text.strip()
-            else:
-                result['text'] = element.text.strip()
-        
-        # Handle child elements
-        for child in element:
-            child_data = self._xml_to_dict(child)
-            
-            if child.tag in result:
-                # Convert to list if multiple elements with same tag
-                if not isinstance(result[child.tag], list):
-                    result[child.tag] = [result[child.tag]]
-                result[child.tag].append(child_data)
-            else:
-                result[child.tag] = child_data
-        
-        return result
+    def _xml_to_dict(self, content: bytes) -> Dict[str, Any]:
+        """Convert an XML document to a dictionary"""
+        return _parse_xml_bytes(content)
     
     def combine_data(self, s3_key: str, excel_data: Dict[str, Any], 
-                    api_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Combine Excel and API data into metadata"""
+                    api_data: Dict[str, Any],
+                    processing_timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Combine Excel and API data into metadata
+        
+        api_data may be shared with other keys through the API cache; build
+        new values instead of modifying it in place.
+        """
+        if processing_timestamp is None:
+            processing_timestamp = datetime.now(timezone.utc).isoformat()
+        
         metadata = {
             "s3_key": s3_key,
-            "processing_timestamp": pd.Timestamp.now().isoformat(),
+            "processing_timestamp": processing_timestamp,
             "excel_data": excel_data,
             "api_data": api_data
         }
@@ -203,23 +433,83 @@ class S3ExcelAPIOrchestrator:
         
         return metadata
     
+    def _metadata_hash(self, metadata: Dict[str, Any]) -> str:
+        """Hash metadata content, ignoring the per-run processing timestamp"""
+        content = {k: v for k, v in metadata.items() if k != 'processing_timestamp'}
+        content_bytes = orjson.dumps(
+            content,
+            default=str,
+            option=(orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                    | orjson.OPT_SORT_KEYS)
+        )
+        return hashlib.blake2b(content_bytes, digest_size=16).hexdigest()
+    
     def update_s3_metadata(self, s3_key: str, metadata: Dict[str, Any]) -> bool:
-        """Update S3 object metadata"""
+        """
+        Update S3 object metadata, skipping objects whose metadata is unchanged
+        
+        The skip decision only looks at the hash tag on the object, so a
+        sidecar deleted since the last run is not restored until the
+        metadata changes (or the tag is removed). If the tags cannot be read
+        or the object already has the maximum number of tags, the sidecar is
+        still written but no hash is recorded.
+        """
         try:
-            # Convert metadata to JSON string for storage
-            metadata_str = json.dumps(metadata, default=str)
+            new_hash = self._metadata_hash(metadata)
+            
+            # Compare against the hash tagged on a previous run
+            try:
+                tag_set = self.s3_client.get_object_tagging(
+                    Bucket=self.s3_bucket_name,
+                    Key=s3_key
+                )['TagSet']
+            except ClientError as e:
+                logger.warning(f"Could not read tags for {s3_key}, "
+                               f"updating without change detection: {str(e)}")
+                tag_set = None
+            
+            prior_hash = next(
+                (tag['Value'] for tag in tag_set or []
+                 if tag['Key'] == METADATA_HASH_TAG),
+                None
+            )
+            if prior_hash == new_hash:
+                logger.debug(f"Metadata unchanged for {s3_key}, skipping update")
+                return True
+            
+            # Convert metadata to JSON bytes for storage
+            metadata_bytes = orjson.dumps(
+                metadata,
+                default=str,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            )
             
-            # Copy object with new metadata
-            copy_source = {'Bucket': self.s3_bucket_name, 'Key': s3_key}
+            # Store metadata in a sidecar object instead of copying the
+            # object onto itself, so only the metadata bytes are written
+            self.s3_client.put_object(
+                Bucket=self.s3_bucket_name,
+                Key=f"{s3_key}{METADATA_SUFFIX}",
+                Body=metadata_bytes,
+                ContentType='application/json'
+            )
             
-            self.s3_client.copy_object(
-                CopySource=copy_source,
+            # Without the current tags, writing would clobber them
+            if tag_set is None:
+                return True
+            
+            # Tag the object with a hash of its metadata (no data movement),
+            # keeping any unrelated tags already on it
+            tag_set = [tag for tag in tag_set if tag['Key'] != METADATA_HASH_TAG]
+            if len(tag_set) >= S3_MAX_OBJECT_TAGS:
+                logger.warning(f"{s3_key} already has {len(tag_set)} tags; not "
+                               f"recording metadata hash, so it will be "
+                               f"rewritten on every run")
+                return True
+            tag_set.append({'Key': METADATA_HASH_TAG, 'Value': new_hash})
+            self.s3_client.put_object_tagging(
                 Bucket=self.s3_bucket_name,
                 Key=s3_key,
-                Metadata={
-                    'processing-metadata': metadata_str
-                },
-                MetadataDirective='REPLACE'
+                Tagging={'TagSet': tag_set}
             )
             
             return True
@@ -228,24 +518,33 @@ class S3ExcelAPIOrchestrator:
             logger.error(f"Failed to update S3 metadata for {s3_key}: {str(e)}")
             return False
     
-    async def process_single_key(self, session: aiohttp.ClientSession, 
-                               s3_key: str) -> ProcessingResult:
+    async def process_single_key(self, client: httpx.AsyncClient, 
+                               s3_key: str,
+                               excel_data: Optional[Dict[str, Any]] = None,
+                               processing_timestamp: Optional[str] = None) -> ProcessingResult:
         """Process a single S3 key"""
         try:
             # Extract identifier from S3 key
             identifier = self.extract_identifier_from_key(s3_key)
             
             # Get Excel data
-            excel_data = self.get_excel_row(identifier)
+            if excel_data is None:
+                excel_data = self.get_excel_row(identifier)
             
             # Query API
-            api_data = await self.query_api(session, identifier)
+            api_data = await self.query_api(client, identifier)
             
             # Combine data
-            combined_metadata = self.combine_data(s3_key, excel_data, api_data)
+            combined_metadata = self.combine_data(
+                s3_key, excel_data, api_data, processing_timestamp
+            )
             
-            # Update S3 metadata
-            success = self.update_s3_metadata(s3_key, combined_metadata)
+            # Update S3 metadata off the event loop (boto3 calls block),
+            # on the run's S3 thread pool when one is active
+            loop = asyncio.get_running_loop()
+            success = await loop.run_in_executor(
+                self._s3_executor, self.update_s3_metadata, s3_key, combined_metadata
+            )
             
             return ProcessingResult(
                 s3_key=s3_key,
@@ -266,83 +565,201 @@ class S3ExcelAPIOrchestrator:
                 error_message=str(e)
             )
     
-    async def process_keys_async(self, s3_keys: List[str], 
-                               max_concurrent: int = 10) -> List[ProcessingResult]:
-        """Process multiple S3 keys asynchronously"""
-        semaphore = asyncio.Semaphore(max_concurrent)
-        
-        async def process_with_semaphore(session, key):
-            async with semaphore:
-                return await self.process_single_key(session, key)
-        
-        async with aiohttp.ClientSession() as session:
-            tasks = [process_with_semaphore(session, key) for key in s3_keys]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Handle exceptions
-            processed_results = []
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    processed_results.append(ProcessingResult(
-                        s3_key=s3_keys[i],
+    def _record_result(self, result: ProcessingResult,
+                       on_result: Optional[ResultCallback]) -> ProcessingResult:
+        """
+        Hand a result to the on_result callback, if any
+        
+        When a callback is given it owns the full result; only the key,
+        status and error are kept so memory does not grow with the payloads.
+        """
+        if on_result is None:
+            return result
+        
+        on_result(result)
+        return ProcessingResult(
+            s3_key=result.s3_key,
+            excel_data={},
+            api_data={},
+            combined_metadata={},
+            success=result.success,
+            error_message=result.error_message
+        )
+    
+    def _create_http_client(self, max_concurrent: int) -> httpx.AsyncClient:
+        """
+        Create an HTTP client tuned for repeated calls to the API host
+        
+        Uses HTTP/2 when the h2 package is installed, so requests are
+        multiplexed over a few connections; otherwise falls back to pooled
+        HTTP/1.1 keep-alive connections.
+        """
+        limits = httpx.Limits(
+            max_connections=max_concurrent,
+            max_keepalive_connections=max_concurrent,
+            keepalive_expiry=60
+        )
+        return httpx.AsyncClient(http2=HTTP2_ENABLED, limits=limits,
+                                 timeout=30.0, follow_redirects=True)
+    
+    async def process_keys_async(self, s3_keys: Iterable[str], 
+                               max_concurrent: int = 10,
+                               processing_timestamp: Optional[str] = None,
+                               on_result: Optional[ResultCallback] = None) -> List[ProcessingResult]:
+        """
+        Process S3 keys asynchronously with a fixed pool of workers
+        
+        Keys are pulled from the iterable in batches off the event loop, so
+        listing (e.g. a get_s3_keys generator) overlaps with processing.
+        """
+        if processing_timestamp is None:
+            processing_timestamp = datetime.now(timezone.utc).isoformat()
+        if self.api_cache_per_run:
+            self.clear_api_cache()
+        
+        queue = asyncio.Queue(maxsize=max_concurrent * 2)
+        results = []
+        
+        async def produce():
+            key_iter = iter(s3_keys)
+            while True:
+                batch = await asyncio.to_thread(
+                    lambda: list(islice(key_iter, S3_LIST_PAGE_SIZE))
+                )
+                if not batch:
+                    break
+                for key, excel_data in self._match_excel_rows(batch):
+                    await queue.put((key, excel_data))
+            
+            # One sentinel per worker to shut the pool down
+            for _ in range(max_concurrent):
+                await queue.put(None)
+        
+        async def worker(client):
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                key, excel_data = item
+                try:
+                    result = await self.process_single_key(
+                        client, key, excel_data, processing_timestamp
+                    )
+                except Exception as e:
+                    result = ProcessingResult(
+                        s3_key=key,
                         excel_data={},
                         api_data={},
                         combined_metadata={},
                         success=False,
-                        error_message=str(result)
-                    ))
-                else:
-                    processed_results.append(result)
-            
-            return processed_results
+                        error_message=str(e)
+                    )
+                results.append(self._record_result(result, on_result))
+        
+        if self.xml_parse_processes and self._xml_pool is None:
+            # Kept for the orchestrator's lifetime so workers start only once
+            self._xml_pool = ProcessPoolExecutor(
+                max_workers=self.xml_parse_processes,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        
+        # One S3 thread per worker, independent of the loop's default executor
+        self._s3_executor = ThreadPoolExecutor(max_workers=max_concurrent)
+        try:
+            async with self._create_http_client(max_concurrent) as client:
+                tasks = [asyncio.create_task(produce())]
+                tasks += [asyncio.create_task(worker(client))
+                          for _ in range(max_concurrent)]
+                try:
+                    await asyncio.gather(*tasks)
+                finally:
+                    # If the producer or an on_result callback raised, stop the
+                    # remaining tasks so none is left blocked on the queue
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._s3_executor.shutdown(wait=False)
+            self._s3_executor = None
+        
+        return results
     
-    def process_keys_sync(self, s3_keys: List[str], 
-                         max_workers: int = 5) -> List[ProcessingResult]:
-        """Process multiple S3 keys synchronously with threading"""
-        def process_key_sync(s3_key):
-            return asyncio.run(self.process_single_key_sync(s3_key))
+    def process_keys_sync(self, s3_keys: Iterable[str], 
+                         max_workers: int = 5,
+                         processing_timestamp: Optional[str] = None,
+                         on_result: Optional[ResultCallback] = None) -> List[ProcessingResult]:
+        """
+        Process S3 keys synchronously with threading
+        
+        At most 2 * max_workers keys are in flight at once, so keys can be
+        streamed from get_s3_keys without queueing every future up front.
+        """
+        if processing_timestamp is None:
+            processing_timestamp = datetime.now(timezone.utc).isoformat()
+        if self.api_cache_per_run:
+            self.clear_api_cache()
         
         results = []
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_key = {
-                executor.submit(process_key_sync, key): key 
-                for key in s3_keys
-            }
-            
-            for future in as_completed(future_to_key):
+        pending = {}
+        
+        def collect(done):
+            for future in done:
+                key = pending.pop(future)
                 try:
                     result = future.result()
-                    results.append(result)
                 except Exception as e:
-                    key = future_to_key[future]
-                    results.append(ProcessingResult(
+                    result = ProcessingResult(
                         s3_key=key,
                         excel_data={},
                         api_data={},
                         combined_metadata={},
                         success=False,
                         error_message=str(e)
-                    ))
+                    )
+                results.append(self._record_result(result, on_result))
+        
+        key_iter = iter(s3_keys)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                batch = list(islice(key_iter, S3_LIST_PAGE_SIZE))
+                if not batch:
+                    break
+                for key, excel_data in self._match_excel_rows(batch):
+                    if len(pending) >= max_workers * 2:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    future = executor.submit(self.process_single_key_sync,
+                                             key, excel_data, processing_timestamp)
+                    pending[future] = key
+            
+            collect(list(as_completed(pending)))
         
         return results
     
-    async def process_single_key_sync(self, s3_key: str) -> ProcessingResult:
+    def process_single_key_sync(self, s3_key: str,
+                                excel_data: Optional[Dict[str, Any]] = None,
+                                processing_timestamp: Optional[str] = None) -> ProcessingResult:
         """Synchronous version of process_single_key"""
         try:
             identifier = self.extract_identifier_from_key(s3_key)
-            excel_data = self.get_excel_row(identifier)
+            if excel_data is None:
+                excel_data = self.get_excel_row(identifier)
             
             # Synchronous API call
-            url = f"{self.api_base_url}/{identifier}"
-            response = requests.get(url, timeout=30)
-            
-            if response.status_code == 200:
-                root = ET.fromstring(response.text)
-                api_data = self._xml_to_dict(root)
-            else:
-                api_data = {"error": f"API request failed with status {response.status_code}"}
+            api_data = self._get_cached_api_data(identifier)
+            if api_data is None:
+                url = f"{self.api_base_url}/{identifier}"
+                response = self._http.get(url, timeout=30)
+                
+                if response.status_code == 200:
+                    api_data = self._xml_to_dict(response.content)
+                    self._cache_api_data(identifier, api_data)
+                else:
+                    api_data = {"error": f"API request failed with status {response.status_code}"}
             
-            combined_metadata = self.combine_data(s3_key, excel_data, api_data)
+            combined_metadata = self.combine_data(
+                s3_key, excel_data, api_data, processing_timestamp
+            )
             success = self.update_s3_metadata(s3_key, combined_metadata)
             
             return ProcessingResult(
@@ -363,22 +780,43 @@ class S3ExcelAPIOrchestrator:
                 error_message=str(e)
             )
     
-    def run_orchestrator(self, prefix: str = '', max_keys: int = 1000, 
-                        use_async: bool = True, max_concurrent: int = 10) -> List[ProcessingResult]:
-        """Main orchestrator method"""
+    def close(self) -> None:
+        """Release the HTTP session and XML parsing processes"""
+        self._http.close()
+        if self._xml_pool is not None:
+            self._xml_pool.shutdown()
+            self._xml_pool = None
+    
+    def run_orchestrator(self, prefix: str = '', max_keys: Optional[int] = None, 
+                        use_async: bool = True, max_concurrent: int = 10,
+                        on_result: Optional[ResultCallback] = None) -> List[ProcessingResult]:
+        """
+        Main orchestrator method
+        
+        If on_result is given, each full ProcessingResult is passed to it as
+        soon as it is ready and the returned list only holds each key's
+        status and error message.
+        """
         try:
-            # Get S3 keys
+            # Stream S3 keys into processing as they are listed
             s3_keys = self.get_s3_keys(prefix, max_keys)
             
-            if not s3_keys:
-                logger.warning("No S3 keys found")
-                return []
+            # One timestamp for the whole batch
+            batch_ts = datetime.now(timezone.utc).isoformat()
             
             # Process keys
             if use_async:
-                results = asyncio.run(self.process_keys_async(s3_keys, max_concurrent))
+                results = asyncio.run(
+                    self.process_keys_async(s3_keys, max_concurrent, batch_ts, on_result)
+                )
             else:
-                results = self.process_keys_sync(s3_keys, max_concurrent)
+                results = self.process_keys_sync(
+                    s3_keys, max_concurrent, batch_ts, on_result
+                )
+            
+            if not results:
+                logger.warning("No S3 keys found")
+                return []
             
             # Log summary
             successful = sum(1 for r in results if r.success)
@@ -0,0 +1,186 @@
+import asyncio
+
+import httpx
+import pandas as pd
+import pytest
+from botocore.exceptions import ClientError
+
+import s3_orchestrator
+from s3_orchestrator import S3ExcelAPIOrchestrator
+
+
+API_BASE_URL = 'http://api.test/data'
+
+
+class FakeS3Client:
+    """Records the S3 calls made by update_s3_metadata"""
+
+    def __init__(self, tags=None, deny_tag_read=False):
+        self.tags = tags or {}
+        self.deny_tag_read = deny_tag_read
+        self.objects = {}
+
+    def get_object_tagging(self, Bucket, Key):
+        if self.deny_tag_read:
+            raise ClientError({'Error': {'Code': 'AccessDenied'}}, 'GetObjectTagging')
+        return {'TagSet': list(self.tags.get(Key, []))}
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.objects[Key] = Body
+
+    def put_object_tagging(self, Bucket, Key, Tagging):
+        self.tags[Key] = Tagging['TagSet']
+
+
+class FakeResponse:
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+
+class FakeHttpSession:
+    """Stands in for the requests session used by the threaded path"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, timeout):
+        self.calls.append(url)
+        identifier = url.rsplit('/', 1)[1]
+        return FakeResponse(200, f'<r><id>{identifier}</id></r>'.encode())
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    excel_df = pd.DataFrame({'file_id': ['k1', 'k2'], 'value': [1.0, None]})
+    monkeypatch.setattr(s3_orchestrator.pd, 'read_excel', lambda *a, **kw: excel_df)
+
+    orch = S3ExcelAPIOrchestrator(
+        s3_bucket_name='bucket',
+        excel_file_path='sheet.xlsx',
+        api_base_url=API_BASE_URL,
+        excel_match_column='file_id',
+        aws_access_key_id='test',
+        aws_secret_access_key='test',
+    )
+    orch.s3_client = FakeS3Client()
+    orch._http = FakeHttpSession()
+    yield orch
+    orch.close()
+
+
+def use_transport(monkeypatch, orch, handler):
+    """Route the async path's API calls through an httpx MockTransport"""
+    monkeypatch.setattr(
+        orch, '_create_http_client',
+        lambda max_concurrent: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+
+def xml_handler(request):
+    identifier = request.url.path.rsplit('/', 1)[1]
+    return httpx.Response(200, content=f'<r><id>{identifier}</id></r>'.encode())
+
+
+def run(coro):
+    # Fail instead of hanging if the pipeline wedges
+    return asyncio.run(asyncio.wait_for(coro, timeout=10))
+
+
+def failing_callback(result):
+    raise RuntimeError('callback failed')
+
+
+def test_async_on_result_error_propagates(monkeypatch, orchestrator):
+    use_transport(monkeypatch, orchestrator, xml_handler)
+    keys = [f'prefix/k{i}.txt' for i in range(30)]
+
+    with pytest.raises(RuntimeError, match='callback failed'):
+        run(orchestrator.process_keys_async(keys, max_concurrent=2,
+                                            on_result=failing_callback))
+
+
+def test_sync_on_result_error_propagates(orchestrator):
+    keys = [f'prefix/k{i}.txt' for i in range(30)]
+
+    with pytest.raises(RuntimeError, match='callback failed'):
+        orchestrator.process_keys_sync(keys, max_workers=2, on_result=failing_callback)
+
+
+def test_async_keeps_duplicate_keys(monkeypatch, orchestrator):
+    use_transport(monkeypatch, orchestrator, xml_handler)
+
+    results = run(orchestrator.process_keys_async(['k1.txt', 'k1.txt', 'k2.txt']))
+
+    assert sorted(r.s3_key for r in results) == ['k1.txt', 'k1.txt', 'k2.txt']
+    assert all(r.success for r in results)
+
+
+def test_sync_keeps_duplicate_keys(orchestrator):
+    results = orchestrator.process_keys_sync(['k1.txt', 'k1.txt', 'k2.txt'])
+
+    assert sorted(r.s3_key for r in results) == ['k1.txt', 'k1.txt', 'k2.txt']
+    assert all(r.success for r in results)
+
+
+def test_concurrent_lookups_share_one_fetch(orchestrator):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.path)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, content=b'<r><id>k1</id></r>')
+
+    async def lookup():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await asyncio.gather(
+                *(orchestrator.query_api(client, 'k1') for _ in range(5))
+            )
+
+    results = run(lookup())
+
+    assert len(calls) == 1
+    assert results == [{'id': 'k1'}] * 5
+
+
+def test_failed_fetches_are_not_cached(orchestrator):
+    responses = [
+        httpx.Response(500),
+        httpx.Response(200, content=b'<r error="none"><id>k1</id></r>'),
+    ]
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return responses[min(len(calls), len(responses)) - 1]
+
+    async def lookup():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return [await orchestrator.query_api(client, 'k1') for _ in range(3)]
+
+    failed, fetched, cached = run(lookup())
+
+    assert failed == {'error': 'API request failed with status 500'}
+    # A payload with an 'error' attribute is still a successful response
+    assert fetched == cached == {'error': 'none', 'id': 'k1'}
+    assert len(calls) == 2
+
+
+def test_metadata_written_when_tags_unreadable(orchestrator):
+    orchestrator.s3_client = FakeS3Client(deny_tag_read=True)
+
+    assert orchestrator.update_s3_metadata('k1.txt', {'s3_key': 'k1.txt'})
+    assert 'k1.txt.meta.json' in orchestrator.s3_client.objects
+    assert 'k1.txt' not in orchestrator.s3_client.tags
+
+
+def test_metadata_written_when_tag_limit_reached(orchestrator):
+    full_tags = [{'Key': f'tag{i}', 'Value': 'v'} for i in range(10)]
+    orchestrator.s3_client = FakeS3Client(tags={'k1.txt': full_tags})
+
+    assert orchestrator.update_s3_metadata('k1.txt', {'s3_key': 'k1.txt'})
+    assert 'k1.txt.meta.json' in orchestrator.s3_client.objects
+    assert orchestrator.s3_client.tags['k1.txt'] == full_tags